@@ -7,14 +7,17 @@ _TMUX_BOT_HELPERS_LOADED=1
 # Helper functions for tmux-bot plugin
 
 # Get the current script directory
-CURRENT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-# Source variables
-source "$(dirname "${BASH_SOURCE[0]}")/variables.sh"
+# 参数展开取目录，省去 dirname/cd/pwd 三次 fork；无斜杠路径回退为当前目录
+CURRENT_DIR="${BASH_SOURCE[0]%/*}"
+[ "$CURRENT_DIR" = "${BASH_SOURCE[0]}" ] && CURRENT_DIR="."
+# Source variables（复用上面算好的目录，不再重复 dirname）
+source "$CURRENT_DIR/variables.sh"
 
 get_tmux_option() {
   local option=$1
   local default_value=$2
-  local option_value=$(tmux show-option -gqv "$option")
+  local option_value
+  option_value=$(tmux show-option -gqv "$option")
   if [ -z "$option_value" ]; then
     echo "$default_value"
   else
@@ -61,15 +64,16 @@ display_info() {
 }
 
 # Get current operating system
+# 使用 bash 内置的 $OSTYPE，避免 fork uname
 get_os() {
-  case "$(uname -s)" in
-  Darwin)
+  case "$OSTYPE" in
+  darwin*)
     echo "macOS"
     ;;
-  Linux)
+  linux*)
     echo "Linux"
     ;;
-  CYGWIN* | MINGW* | MSYS*)
+  cygwin* | msys* | mingw*)
     echo "Windows"
     ;;
   *)
@@ -85,7 +89,8 @@ get_shell() {
   elif [ -n "$ZSH_VERSION" ]; then
     echo "zsh"
   else
-    echo "$(basename "$SHELL")"
+    # 参数展开取路径末段，不 fork basename
+    echo "${SHELL##*/}"
   fi
 }
 
@@ -104,57 +109,104 @@ parse_template() {
   echo "$template"
 }
 
+# Spinner 帧在文件级定义一次，show_spinner 每次调用只做查表
+_SPINNER_FRAMES=("⣾" "⣽" "⣻" "⢿" "⡿" "⣟" "⣯" "⣷")
+_SPINNER_FRAME_COUNT=${#_SPINNER_FRAMES[@]}
+
 # Show spinner animation in tmux status bar.
 # Using 'tmux display-message' is the recommended way to show progress for
 # scripts running from 'command-prompt' as it does not interfere with the user's pane.
 show_spinner() {
   local pid=$1
   local delay=0.2
-  # Array of spinner characters
-  local spinstr=("⣾" "⣽" "⣻" "⢿" "⡿" "⣟" "⣯" "⣷")
 
   local index=0
-  local length=${#spinstr[@]}
+  local length=$_SPINNER_FRAME_COUNT
+
+  # 打开一个读写管道 fd，用内置 read -t 定时，整个动画只 fork 一次。
+  # macOS 的 /dev/fd 不允许以读写方式打开只读 fd（dup 语义），
+  # 打开失败时回退到每帧 sleep；花括号组让 2>/dev/null 不被 exec 固化
+  local sleep_fd=""
+  { exec {sleep_fd}<> <(:); } 2>/dev/null || sleep_fd=""
 
-  while ps -p "$pid" >/dev/null 2>&1; do
-    local char="${spinstr[$index]}"
+  # kill -0 是 bash 内置的存活探测，避免每帧 fork 一次 ps
+  while kill -0 "$pid" 2>/dev/null; do
+    local char="${_SPINNER_FRAMES[$index]}"
     tmux display-message -F "#[fg=blue] $char #[fg=default]Thinking of the perfect command..."
     index=$(((index + 1) % length))
-    sleep $delay
+    if [ -n "$sleep_fd" ]; then
+      read -r -t "$delay" -u "$sleep_fd" || true
+    else
+      sleep "$delay"
+    fi
   done
 
+  # 仅在成功打开时关闭 fd
+  [ -n "$sleep_fd" ] && exec {sleep_fd}>&-
+
   tmux display-message -d 10 "" # Clear the message
 }
 
+# 缓存 prefix 表中已绑定的键位，bot.tmux 检查多个键时只 fork 一次 tmux
+_TMUX_BOUND_PREFIX_KEYS=()
+_TMUX_PREFIX_KEYS_LOADED=""
+
+_load_bound_prefix_keys() {
+    # 精确取第 4 列（键位置），避免误匹配 command 内容
+    local key
+    while read -r _ _ _ key _; do
+        [ -n "$key" ] && _TMUX_BOUND_PREFIX_KEYS+=("$key")
+    done < <(tmux list-keys -T prefix 2>/dev/null)
+    _TMUX_PREFIX_KEYS_LOADED=1
+}
+
+# Record a key we just bound, keeping the cached list in sync
+# 每次 tmux bind-key 之后必须调用，否则后续检查会拿到过期快照
+mark_key_bound() {
+    _TMUX_BOUND_PREFIX_KEYS+=("$1")
+}
+
 # Check if a key binding is already set
 # Returns 0 if key is available, 1 if already bound
 # Usage: key_binding_not_set "v" && tmux bind-key v command
 key_binding_not_set() {
     local key="$1"
 
-    # 检查 prefix 表中是否已有该键的绑定
-    # 使用 awk 精确匹配第 4 列（键位置），避免误匹配 command 内容
-    if tmux list-keys -T prefix 2>/dev/null | awk -v key="$key" 'BEGIN {found=0} $4 == key {found=1; exit} END {exit !found}'; then
-        return 1  # Key is already bound
-    else
-        return 0  # Key is available
-    fi
+    [ -z "$_TMUX_PREFIX_KEYS_LOADED" ] && _load_bound_prefix_keys
+
+    local bound
+    for bound in "${_TMUX_BOUND_PREFIX_KEYS[@]}"; do
+        if [ "$bound" = "$key" ]; then
+            return 1  # Key is already bound
+        fi
+    done
+    return 0  # Key is available
+}
+
+# 缓存 tmux 版本字符串，进程内只探测一次（tmux -V + 解析管道）
+_TMUX_VERSION=""
+_TMUX_VERSION_RAW=""
+_TMUX_VERSION_LOADED=""
+
+_load_tmux_version() {
+    _TMUX_VERSION_RAW=$(tmux -V 2>/dev/null)
+    # 提取版本号（去除字母后缀，如 "3.2a" -> "3.2"）
+    _TMUX_VERSION=$(echo "$_TMUX_VERSION_RAW" | grep -oE '[0-9]+\.[0-9]+' | head -1)
+    _TMUX_VERSION_LOADED=1
 }
 
 # Check if tmux version meets minimum requirement
 # Usage: tmux_version_ok "1.9" || die "Requires tmux 1.9+"
 tmux_version_ok() {
     local required_version="$1"
-    local current_version
 
-    # 提取版本号（去除字母后缀，如 "3.2a" -> "3.2"）
-    current_version=$(tmux -V 2>/dev/null | grep -oE '[0-9]+\.[0-9]+' | head -1)
+    [ -z "$_TMUX_VERSION_LOADED" ] && _load_tmux_version
 
-    if [ -z "$current_version" ]; then
+    if [ -z "$_TMUX_VERSION" ]; then
         return 1  # tmux not found or version unparseable
     fi
 
     # 使用 awk 比较版本号（浮点数比较）
-    awk -v cur="$current_version" -v req="$required_version" \
+    awk -v cur="$_TMUX_VERSION" -v req="$required_version" \
         'BEGIN { exit (cur < req) }'
 }
@@ -1,25 +1,25 @@
 #!/usr/bin/env bash
 
-# Source helper functions FIRST
-source "$(dirname "${BASH_SOURCE[0]}")/helpers.sh"
-source "$(dirname "${BASH_SOURCE[0]}")/variables.sh"
-
-# Check dependencies IMMEDIATELY (before any other operations)
-if ! check_dependencies; then
-  exit 1
-fi
-
-# Get user prompt
+# Get user prompt FIRST - empty invocations exit before any other work
+# 去除首尾空白：纯空白输入与空输入一样，不值得一次 API 往返
 USER_PROMPT="$1"
+USER_PROMPT="${USER_PROMPT#"${USER_PROMPT%%[![:space:]]*}"}"
+USER_PROMPT="${USER_PROMPT%"${USER_PROMPT##*[![:space:]]}"}"
 if [ -z "$USER_PROMPT" ]; then
     tmux display-message "Error: No prompt provided"
     exit 1
 fi
 
-# Get system information
-CURRENT_OS=$(get_os)
-CURRENT_SHELL=$(get_shell)
-PARSED_SYSTEM_PROMPT=$(parse_template "$SYSTEM_PROMPT" "$CURRENT_OS" "$CURRENT_SHELL" "")
+# Source helper functions (helpers.sh loads variables.sh itself)
+# 参数展开取目录，省去 dirname 的命令替换 fork
+SCRIPT_DIR="${BASH_SOURCE[0]%/*}"
+[ "$SCRIPT_DIR" = "${BASH_SOURCE[0]}" ] && SCRIPT_DIR="."
+source "$SCRIPT_DIR/helpers.sh"
+
+# Check dependencies before any other operations
+if ! check_dependencies; then
+  exit 1
+fi
 
 # === Configuration Validation Function ===
 validate_config() {
@@ -40,78 +40,94 @@ validate_config() {
     return 0
 }
 
-# Get from tmux options
-tmux_base_url=$(get_tmux_option "@openai_base_url" "$DEFAULT_BASE_URL")
-tmux_api_key=$(get_tmux_option "@openai_api_key" "")
-tmux_model=$(get_tmux_option "@openai_model" "$DEFAULT_MODEL")
+# Get configuration: tmux option → environment variable → default
+# 每个环境变量只展开一次，作为 tmux 选项缺失时的回退值
+tmux_base_url=$(get_tmux_option "@openai_base_url" "${OPENAI_BASE_URL:-$DEFAULT_BASE_URL}")
+tmux_api_key=$(get_tmux_option "@openai_api_key" "${OPENAI_API_KEY:-}")
+tmux_model=$(get_tmux_option "@openai_model" "${OPENAI_MODEL:-$DEFAULT_MODEL}")
+tmux_log=$(get_tmux_option "@tmux_bot_log" "on")
 
 # Validate configuration before proceeding
+# 配置校验先于系统信息收集：配置错误时不做任何无谓工作
 validate_config "$tmux_api_key" "$tmux_base_url" || exit 1
 
 api_url="$tmux_base_url/chat/completions"
 
-# Create log directory if it doesn't exist
-LOG_DIR="/tmp/tmux-bot-logs"
-mkdir -p "$LOG_DIR"
+# Get system information
+CURRENT_OS=$(get_os)
+CURRENT_SHELL=$(get_shell)
+PARSED_SYSTEM_PROMPT=$(parse_template "$SYSTEM_PROMPT" "$CURRENT_OS" "$CURRENT_SHELL" "")
 
-# Generate log filename with timestamp
-LOG_FILE="$LOG_DIR/curl_command_$(date +%Y%m%d_%H%M%S).log"
+LOG_DIR="/tmp/tmux-bot-logs"
+_LOG_PATHS_READY=""
+
+# 日志准备（建目录 + 取时间戳）延迟到确有写入需求时执行，
+# @tmux_bot_log off 且无错误的运行完全零成本；幂等，可被多处调用
+init_log_paths() {
+    # 幂等守卫用脚本自有变量：RUN_TS 可能被用户环境导出，不可作判断依据
+    [ -n "$_LOG_PATHS_READY" ] && return
+    _LOG_PATHS_READY=1
+    # 内置 -d 测试先探测，目录已存在时（稳态）不 fork mkdir
+    [ -d "$LOG_DIR" ] || mkdir -p "$LOG_DIR"
+    # Run timestamp taken once; log and error-response filenames both reuse it
+    RUN_TS=$(date +%Y%m%d_%H%M%S)
+    LOG_FILE="$LOG_DIR/curl_command_${RUN_TS}.log"
+}
 
 # Create unique temporary file for API response
 TEMP_RESPONSE=$(mktemp "${TMPDIR:-/tmp}/tmux-bot-response.XXXXXX")
 
 # Define cleanup function (safe even if CURL_PID is undefined)
+# 先用 kill -0 探活：正常退出路径不再对已回收的 PID 发信号
 cleanup() {
-    [ -n "${CURL_PID:-}" ] && kill "$CURL_PID" 2>/dev/null
+    if [ -n "${CURL_PID:-}" ] && kill -0 "$CURL_PID" 2>/dev/null; then
+        kill "$CURL_PID" 2>/dev/null
+    fi
     rm -f "$TEMP_RESPONSE"
 }
 
 # Set trap for all exit scenarios
 trap cleanup EXIT INT TERM
 
-# Escape JSON strings for proper formatting
-ESCAPED_SYSTEM_PROMPT=$(printf '%s' "$PARSED_SYSTEM_PROMPT" | jq -Rs .)
-ESCAPED_USER_PROMPT=$(printf '%s' "$USER_PROMPT" | jq -Rs .)
-
-# Construct the JSON payload using a HEREDOC
-read -r -d '' JSON_PAYLOAD <<EOF
-{
-  "model": "$tmux_model",
-  "stream": false,
-  "messages": [
-    {
-      "role": "system",
-      "content": $ESCAPED_SYSTEM_PROMPT
-    },
-    {
-      "role": "user",
-      "content": $ESCAPED_USER_PROMPT
-    }
-  ],
-  "temperature": $TEMPERATURE,
-  "max_tokens": $MAX_TOKENS,
-  "top_p": $TOP_P,
-  "frequency_penalty": $FREQUENCY_PENALTY,
-  "presence_penalty": $PRESENCE_PENALTY
-}
-EOF
+# Construct the JSON payload in a single jq call
+# jq --arg 负责字符串转义，无需单独的转义步骤
+JSON_PAYLOAD=$(jq -n \
+  --arg model "$tmux_model" \
+  --arg system_prompt "$PARSED_SYSTEM_PROMPT" \
+  --arg user_prompt "$USER_PROMPT" \
+  --argjson params "$API_PARAMS_JSON" \
+  '{
+    model: $model,
+    stream: false,
+    messages: [
+      {role: "system", content: $system_prompt},
+      {role: "user", content: $user_prompt}
+    ]
+  } + $params')
 
 # Log the curl command to file (with API key redacted)
-{
-    echo "curl -X POST \"$api_url\" \\"
-    echo "  -H \"Content-Type: application/json\" \\"
-    echo "  -H \"Authorization: Bearer ***REDACTED***\" \\"
-    echo "  -d \"$JSON_PAYLOAD\""
-    echo ""
-    echo "Full JSON payload:"
-    echo "$JSON_PAYLOAD"
-} >"$LOG_FILE"
+# 日志关闭时（@tmux_bot_log off）完全跳过脱敏和写入
+if [ "$tmux_log" = "on" ]; then
+    init_log_paths
+    # 单次字符串替换脱敏：防止提示词中意外包含 API key 时泄露到日志
+    SAFE_PAYLOAD="${JSON_PAYLOAD//"$tmux_api_key"/***REDACTED***}"
+    # 单次 printf 写入，整个日志一次 write
+    printf '%s\n' \
+        "curl -X POST \"$api_url\" \\" \
+        "  -H \"Content-Type: application/json\" \\" \
+        "  -H \"Authorization: Bearer ***REDACTED***\" \\" \
+        "  -d @<payload below>" \
+        "" \
+        "Full JSON payload:" \
+        "$SAFE_PAYLOAD" >"$LOG_FILE"
+fi
 
 # Make the API call in background and show spinner animation
-curl -X POST "$api_url" \
+# -s 让 curl 根本不生成进度条/错误输出，而不是生成后再丢弃
+curl -s -X POST "$api_url" \
   -H "Content-Type: application/json" \
   -H "Authorization: Bearer $tmux_api_key" \
-  -d "$JSON_PAYLOAD" >"$TEMP_RESPONSE" 2>/dev/null &
+  -d "$JSON_PAYLOAD" >"$TEMP_RESPONSE" &
 CURL_PID=$!
 
 # Show spinner animation while waiting for API response
@@ -120,6 +136,7 @@ show_spinner $CURL_PID
 # Wait for curl to finish and get the exit status
 wait $CURL_PID
 CURL_EXIT=$?
+CURL_PID="" # 已回收，后续 cleanup 无需处理
 
 # Parse the response if curl succeeded
 if [ $CURL_EXIT -eq 0 ]; then
@@ -128,13 +145,24 @@ if [ $CURL_EXIT -eq 0 ]; then
 
   # Check jq parsing result
   if [ $JQ_EXIT -ne 0 ]; then
-      tmux display-message -d 3000 -F "#[fg=red]Error: Failed to parse API response (invalid JSON)"
+      # 保留原始响应供排查：mv 在同一文件系统内只改目录项，零数据拷贝
+      init_log_paths
+      ERROR_FILE="$LOG_DIR/error_response_${RUN_TS}.json"
+      mv "$TEMP_RESPONSE" "$ERROR_FILE" 2>/dev/null
+      tmux display-message -d 3000 -F "#[fg=red]Error: Failed to parse API response (invalid JSON). Raw response: $ERROR_FILE"
       exit 1
   fi
 
   # Check if jq returned null or empty
   if [ -z "$AI_COMMAND" ] || [ "$AI_COMMAND" = "null" ]; then
-      tmux display-message "AI did not return a valid command for the prompt: $USER_PROMPT"
+      # 区分 API 自身的错误（如无效 key、模型不存在）和空响应
+      # 配置类错误重试无意义，直接显示服务端的具体原因
+      API_ERROR=$(jq -r '.error.message // empty' "$TEMP_RESPONSE" 2>/dev/null)
+      if [ -n "$API_ERROR" ]; then
+          tmux display-message -d 5000 -F "#[fg=red]API error: $API_ERROR"
+      else
+          tmux display-message "AI did not return a valid command for the prompt: $USER_PROMPT"
+      fi
       exit 1
   fi
 else
@@ -142,21 +170,19 @@ else
   exit 1
 fi
 
-# Check if command was denied for safety reasons
-if [ "$AI_COMMAND" = "DENIED" ]; then
+# Safety checks: DENIED / Ambiguous 用单个 case 分发，正常命令直接落空
+case "$AI_COMMAND" in
+DENIED)
   tmux display-message -F "#[fg=red] Dangerous operation detected. Command generating denied."
   exit 0
-fi
-
-# Check if command contains "Ambiguous" and display the full message
-if echo "$AI_COMMAND" | grep -q "Ambiguous"; then
+  ;;
+*Ambiguous*)
   tmux display-message -F "#[fg=yellow] $AI_COMMAND"
   exit 0
-fi
-
-# Clear any existing input in the current line first
-tmux send-keys C-u
+  ;;
+esac
 
-# Send the extracted command to the current tmux pane.
-# The -l flag ensures the command is inserted literally, character by character.
-tmux send-keys -l -- "$AI_COMMAND"
+# Clear any existing input, then send the extracted command to the current
+# tmux pane. The -l flag ensures the command is inserted literally.
+# 两条 send-keys 合并为一次 tmux 调用：单次客户端往返，清行和插入原子执行
+tmux send-keys C-u \; send-keys -l -- "$AI_COMMAND"
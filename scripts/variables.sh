@@ -7,16 +7,26 @@ _TMUX_BOT_VARIABLES_LOADED=1
 # Variables for tmux-bot plugin
 
 # Default API configuration
-DEFAULT_BASE_URL="https://api.openai.com/v1"
-DEFAULT_MODEL="gpt-4"
+readonly DEFAULT_BASE_URL="https://api.openai.com/v1"
+readonly DEFAULT_MODEL="gpt-4"
 
 # API request parameters
-TEMPERATURE=0.0
-MAX_TOKENS=150
-TOP_P=1
-FREQUENCY_PENALTY=0
-PRESENCE_PENALTY=0
-SYSTEM_PROMPT="You are a {OS} terminal command generator. Convert natural language to executable Bash commands for {SHELL}.
+readonly TEMPERATURE=0.0
+readonly MAX_TOKENS=150
+readonly TOP_P=1
+readonly FREQUENCY_PENALTY=0
+readonly PRESENCE_PENALTY=0
+
+# 预组装的请求参数 JSON 片段：常量在 source 时序列化一次，
+# 每次请求直接整体并入 payload，无需逐个传参
+readonly API_PARAMS_JSON="{
+  \"temperature\": $TEMPERATURE,
+  \"max_tokens\": $MAX_TOKENS,
+  \"top_p\": $TOP_P,
+  \"frequency_penalty\": $FREQUENCY_PENALTY,
+  \"presence_penalty\": $PRESENCE_PENALTY
+}"
+readonly SYSTEM_PROMPT="You are a {OS} terminal command generator. Convert natural language to executable Bash commands for {SHELL}.
 
 ## OUTPUT RULES
 
@@ -0,0 +1,75 @@
+#!/usr/bin/env bash
+
+# Include guard
+[ -n "$_TMUX_BOT_TEST_FRAMEWORK_LOADED" ] && return
+_TMUX_BOT_TEST_FRAMEWORK_LOADED=1
+
+# 共享断言函数库：各测试文件 source 本文件，避免重复定义
+# 测试计数器
+tests_run=0
+tests_passed=0
+
+assert_equal() {
+    local expected="$1"
+    local actual="$2"
+    local test_name="$3"
+
+    ((tests_run++))
+    if [ "$expected" = "$actual" ]; then
+        echo "  ✓ $test_name"
+        ((tests_passed++))
+        return 0
+    else
+        echo "  ✗ $test_name"
+        echo "    Expected: '$expected'"
+        echo "    Actual:   '$actual'"
+        return 1
+    fi
+}
+
+assert_not_empty() {
+    local value="$1"
+    local test_name="$2"
+
+    ((tests_run++))
+    if [ -n "$value" ]; then
+        echo "  ✓ $test_name"
+        ((tests_passed++))
+        return 0
+    else
+        echo "  ✗ $test_name (value is empty)"
+        return 1
+    fi
+}
+
+assert_match() {
+    local pattern="$1"
+    local text="$2"
+    local test_name="$3"
+
+    ((tests_run++))
+    if echo "$text" | grep -q "$pattern"; then
+        echo "  ✓ $test_name"
+        ((tests_passed++))
+        return 0
+    else
+        echo "  ✗ $test_name (pattern not found: $pattern)"
+        return 1
+    fi
+}
+
+assert_not_match() {
+    local pattern="$1"
+    local text="$2"
+    local test_name="$3"
+
+    ((tests_run++))
+    if ! echo "$text" | grep -q "$pattern"; then
+        echo "  ✓ $test_name"
+        ((tests_passed++))
+        return 0
+    else
+        echo "  ✗ $test_name (pattern should not exist: $pattern)"
+        return 1
+    fi
+}
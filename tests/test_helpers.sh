@@ -1,58 +1,26 @@
 #!/usr/bin/env bash
 
+# 先加载测试框架：helpers.sh 会覆盖全局 CURRENT_DIR
 CURRENT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# shellcheck source=tests/test_framework.sh
+source "$CURRENT_DIR/test_framework.sh"
 source "$CURRENT_DIR/../scripts/helpers.sh"
 
-# 测试计数器
-tests_run=0
-tests_passed=0
-
-# 断言函数
-assert_equal() {
-    local expected="$1"
-    local actual="$2"
-    local test_name="$3"
-
-    ((tests_run++))
-    if [ "$expected" = "$actual" ]; then
-        echo "  ✓ $test_name"
-        ((tests_passed++))
-        return 0
-    else
-        echo "  ✗ $test_name"
-        echo "    Expected: '$expected'"
-        echo "    Actual:   '$actual'"
-        return 1
-    fi
-}
-
-assert_not_empty() {
-    local value="$1"
-    local test_name="$2"
-
-    ((tests_run++))
-    if [ -n "$value" ]; then
-        echo "  ✓ $test_name"
-        ((tests_passed++))
-        return 0
-    else
-        echo "  ✗ $test_name (value is empty)"
-        return 1
-    fi
-}
-
-# 测试1：parse_template 基础替换
-test_parse_template_basic() {
-    local result
-    result=$(parse_template "OS: {OS}, Shell: {SHELL}" "Linux" "bash" "")
-    assert_equal "OS: Linux, Shell: bash" "$result" "parse_template basic replacement"
-}
-
-# 测试2：parse_template 全局替换
-test_parse_template_global() {
-    local result
-    result=$(parse_template "{OS} {OS} {OS}" "macOS" "zsh" "")
-    assert_equal "macOS macOS macOS" "$result" "parse_template global replacement"
+# 测试1：parse_template 参数化用例（模板|OS|Shell|用户输入|期望输出|用例名）
+test_parse_template_cases() {
+    local cases=(
+        "OS: {OS}, Shell: {SHELL}|Linux|bash||OS: Linux, Shell: bash|parse_template basic replacement"
+        "{OS} {OS} {OS}|macOS|zsh||macOS macOS macOS|parse_template global replacement"
+        "run: {USER_PROMPT}|Linux|bash|list files|run: list files|parse_template user prompt replacement"
+        "no placeholders|Linux|bash||no placeholders|parse_template passthrough"
+    )
+
+    local case_line template os shell user_prompt expected test_name result
+    for case_line in "${cases[@]}"; do
+        IFS='|' read -r template os shell user_prompt expected test_name <<<"$case_line"
+        result=$(parse_template "$template" "$os" "$shell" "$user_prompt")
+        assert_equal "$expected" "$result" "$test_name"
+    done
 }
 
 # 测试3：get_os 返回非空值
@@ -71,12 +39,11 @@ test_get_shell() {
 
 # 执行所有测试
 echo "Testing helpers.sh functions..."
-test_parse_template_basic
-test_parse_template_global
+test_parse_template_cases
 test_get_os
 test_get_shell
 
 # 输出结果
 echo ""
 echo "Helpers: $tests_passed/$tests_run passed"
-[ $tests_passed -eq $tests_run ]
+[ "$tests_passed" -eq "$tests_run" ]
@@ -1,44 +1,17 @@
 #!/usr/bin/env bash
 
-tests_run=0
-tests_passed=0
-
-assert_match() {
-    local pattern="$1"
-    local text="$2"
-    local test_name="$3"
-
-    ((tests_run++))
-    if echo "$text" | grep -q "$pattern"; then
-        echo "  ✓ $test_name"
-        ((tests_passed++))
-        return 0
-    else
-        echo "  ✗ $test_name (pattern not found: $pattern)"
-        return 1
-    fi
-}
-
-assert_not_match() {
-    local pattern="$1"
-    local text="$2"
-    local test_name="$3"
-
-    ((tests_run++))
-    if ! echo "$text" | grep -q "$pattern"; then
-        echo "  ✓ $test_name"
-        ((tests_passed++))
-        return 0
-    else
-        echo "  ✗ $test_name (pattern should not exist: $pattern)"
-        return 1
-    fi
-}
+CURRENT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# shellcheck source=tests/test_framework.sh
+source "$CURRENT_DIR/test_framework.sh"
 
 # 测试1：日志中 API key 已脱敏
 test_api_key_redaction() {
-    local latest_log
-    latest_log=$(ls -t /tmp/tmux-bot-logs/*.log 2>/dev/null | head -1)
+    # 用 glob + -nt 找最新日志，单次目录扫描，不 fork ls/head
+    local latest_log="" f
+    for f in /tmp/tmux-bot-logs/*.log; do
+        [ -e "$f" ] || continue
+        [ "$f" -nt "$latest_log" ] && latest_log="$f"
+    done
 
     if [ -z "$latest_log" ]; then
         echo "  - No log files found, skipping API key test"
@@ -58,8 +31,10 @@ test_api_key_redaction() {
 
 # 测试2：临时文件不残留
 test_temp_file_cleanup() {
-    local temp_count
-    temp_count=$(ls /tmp/tmux-bot-response.* 2>/dev/null | wc -l)
+    # glob 直接展开匹配列表，不 fork ls | wc
+    local temp_files=(/tmp/tmux-bot-response.*)
+    [ -e "${temp_files[0]}" ] || temp_files=()
+    local temp_count=${#temp_files[@]}
 
     if [ "$temp_count" -eq 0 ]; then
         echo "  ✓ No leaked temporary files"
@@ -69,7 +44,7 @@ test_temp_file_cleanup() {
     else
         echo "  ✗ Found $temp_count leaked temporary files"
         ((tests_run++))
-        ls /tmp/tmux-bot-response.*
+        printf '%s\n' "${temp_files[@]}"
         return 1
     fi
 }
@@ -81,4 +56,4 @@ test_temp_file_cleanup
 
 echo ""
 echo "Security: $tests_passed/$tests_run passed"
-[ $tests_passed -eq $tests_run ]
+[ "$tests_passed" -eq "$tests_run" ]